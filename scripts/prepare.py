@@ -8,6 +8,8 @@ from pathlib import Path
 
 REPO_ROOT = Path(__file__).parent.parent
 
+_VERSION_LINE = re.compile(r'^version = "([^"]+)"', re.MULTILINE)
+
 VERSION_FILES = [
     "Cargo.toml",
     "Cargo.lock",
@@ -60,28 +62,31 @@ def find_version_in_section(content: str, section: str) -> tuple[str, int, int]
     Returns (version, start_pos, end_pos) of the version value (including quotes),
     or None if not found.
     """
-    # Find section header
-    section_pattern = re.escape(f"[{section}]")
-    section_match = re.search(f"^{section_pattern}$", content, re.MULTILINE)
-    if not section_match:
-        return None
-
-    # Find where this section ends (next section header at start of line)
-    section_start = section_match.end()
-    next_section = re.search(r"^\[", content[section_start:], re.MULTILINE)
-    section_end = section_start + next_section.start() if next_section else len(content)
-    section_content = content[section_start:section_end]
-
-    # Find version = "..." within this section
-    version_match = re.search(r'^version = "([^"]+)"', section_content, re.MULTILINE)
+    # Find the section header with plain substring scans; the fixed strings
+    # don't need a regex engine
+    header = f"[{section}]\n"
+    if content.startswith(header):
+        section_start = len(header)
+    else:
+        idx = content.find(f"\n{header}")
+        if idx == -1:
+            return None
+        section_start = idx + 1 + len(header)
+
+    # Find where this section ends (next section header at start of line);
+    # starting one char back catches a header directly after ours
+    next_section = content.find("\n[", section_start - 1)
+    section_end = len(content) if next_section == -1 else next_section + 1
+
+    # Find version = "..." within this section; searching with bounds keeps
+    # the match positions absolute, so no offset arithmetic or slicing
+    version_match = _VERSION_LINE.search(content, section_start, section_end)
     if not version_match:
         return None
 
     version = version_match.group(1)
-    # Calculate absolute positions of the quoted version value
-    abs_start = section_start + version_match.start(1) - 1  # -1 for opening quote
-    abs_end = section_start + version_match.end(1) + 1  # +1 for closing quote
-    return (version, abs_start, abs_end)
+    # start/end span the quoted version value
+    return (version, version_match.start(1) - 1, version_match.end(1) + 1)
 
 
 def check_working_tree():
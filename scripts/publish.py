@@ -1,42 +1,110 @@
 #!/usr/bin/env python3
 """Publish a release by creating a draft GitHub release with generated notes."""
 
+import asyncio
+import os
 import re
 import subprocess
 import sys
-import tempfile
+import tomllib
+from functools import lru_cache
 from pathlib import Path
 
 REPO_ROOT = Path(__file__).parent.parent
 
+# Compiled once at import; these run on every validation pass.
+_README_REV = re.compile(r"rev: (v[^\s]+)")
+
+
+def _read_small(path: Path) -> str:
+    """Read a small text file via raw os.read, skipping the io/codecs stack.
+
+    One read covers files up to 64KB; larger files just take extra reads.
+    """
+    fd = os.open(str(path), os.O_RDONLY)
+    try:
+        chunks = [os.read(fd, 65536)]
+        while chunks[-1]:
+            chunks.append(os.read(fd, 65536))
+        return b"".join(chunks).decode("utf-8")
+    finally:
+        os.close(fd)
+
 
 def run(cmd: list[str], capture: bool = False, input_text: str | None = None) -> str:
+    """Run a subprocess; raises CalledProcessError on failure.
+
+    Captures bytes and decodes once; skips the io text layer and newline
+    translation, which dominates for tiny outputs like a git SHA.
+    """
     result = subprocess.run(
-        cmd, capture_output=capture, text=True, cwd=REPO_ROOT, input=input_text
+        cmd,
+        capture_output=capture,
+        cwd=REPO_ROOT,
+        input=input_text.encode() if input_text is not None else None,
+        check=True,
     )
-    if result.returncode != 0:
-        if capture and result.stderr:
-            print(result.stderr, file=sys.stderr)
-        sys.exit(1)
-    return result.stdout.strip() if capture else ""
+    return result.stdout.decode("utf-8", "replace").strip() if capture else ""
 
 
+async def run_async(cmd: list[str], check: bool = True) -> str:
+    """Run a subprocess without blocking the event loop; return stripped stdout.
+
+    Raises CalledProcessError on failure; with check=False a failing command
+    returns "" instead.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=REPO_ROOT,
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        if not check:
+            return ""
+        raise subprocess.CalledProcessError(
+            proc.returncode, cmd, output=stdout, stderr=stderr
+        )
+    return stdout.decode("utf-8", "replace").strip()
+
+
+_INVALID = ("", None, None)
+
+
+@lru_cache(maxsize=256)
 def parse_pep440(version: str) -> tuple[str, str | None, int | None]:
     """Parse PEP 440 version, return (base, prerelease_type, prerelease_num).
 
+    Only accepts the narrow N.N.N[(a|b|rc)N] shape this project uses.
     Requires numeric suffix for prerelease markers (e.g., 1.0.0a1, not 1.0.0a).
     """
-    # Try prerelease format first (requires digits after a/b/rc)
-    match = re.match(r"^(\d+\.\d+\.\d+)(a|b|rc)(\d+)$", version)
-    if match:
-        return (match.group(1), match.group(2), int(match.group(3)))
-    # Try stable format (no prerelease marker)
-    match = re.match(r"^(\d+\.\d+\.\d+)$", version)
-    if match:
-        return (match.group(1), None, None)
-    return ("", None, None)
-
-
+    parts = version.split(".")
+    if len(parts) != 3:
+        return _INVALID
+    major, minor, last = parts
+    if not (major.isdecimal() and minor.isdecimal()):
+        return _INVALID
+    # Stable format (no prerelease marker)
+    if last.isdecimal():
+        return (version, None, None)
+    # Prerelease: split the last segment into patch digits and a/b/rc suffix
+    i = 0
+    while i < len(last) and last[i].isdecimal():
+        i += 1
+    patch, suffix = last[:i], last[i:]
+    if not patch:
+        return _INVALID
+    for marker in ("a", "b", "rc"):
+        if suffix.startswith(marker):
+            num = suffix[len(marker) :]
+            if num.isdecimal():
+                return (f"{major}.{minor}.{patch}", marker, int(num))
+            return _INVALID
+    return _INVALID
+
+
+@lru_cache(maxsize=256)
 def pep440_to_semver(version: str) -> str:
     """Convert PEP 440 version to semver."""
     base, pre_type, pre_num = parse_pep440(version)
@@ -48,181 +116,165 @@ def pep440_to_semver(version: str) -> str:
     return f"{base}-{type_map[pre_type]}.{pre_num}"
 
 
-def find_version_in_section(content: str, section: str) -> str | None:
-    """Find version in a TOML section, handling arrays correctly."""
-    # Find section header
-    section_pattern = re.escape(f"[{section}]")
-    section_match = re.search(f"^{section_pattern}$", content, re.MULTILINE)
-    if not section_match:
-        return None
-
-    # Find where this section ends (next section header at start of line)
-    section_start = section_match.end()
-    next_section = re.search(r"^\[", content[section_start:], re.MULTILINE)
-    section_end = section_start + next_section.start() if next_section else len(content)
-    section_content = content[section_start:section_end]
+def parse_git_status(output: str) -> tuple[str, bool]:
+    """Parse `git status --porcelain=v2 --branch` output.
 
-    # Find version = "..." within this section
-    version_match = re.search(r'^version = "([^"]+)"', section_content, re.MULTILINE)
-    if not version_match:
-        return None
-    return version_match.group(1)
+    Returns (branch, dirty). Header lines carry the branch state; any
+    non-header line is a changed or untracked path.
+    """
+    branch = ""
+    dirty = False
+    for line in output.splitlines():
+        if line.startswith("# branch.head "):
+            branch = line[len("# branch.head ") :]
+        elif not line.startswith("#"):
+            dirty = True
+    return branch, dirty
 
 
-def check_branch():
-    print("Verifying on main branch...", end=" ", flush=True)
-    branch = run(["git", "branch", "--show-current"], capture=True)
+def check_branch(branch: str):
     if branch != "main":
-        print(f"no ({branch})")
+        print(f"Verifying on main branch... no ({branch})")
         print("Error: Not on main branch", file=sys.stderr)
         sys.exit(1)
-    print("ok")
+    print("Verifying on main branch... ok")
 
 
-def check_working_tree():
-    print("Checking working tree...", end=" ", flush=True)
-    status = run(["git", "status", "--porcelain"], capture=True)
-    if status:
-        print("dirty")
+def check_working_tree(dirty: bool):
+    if dirty:
+        print("Checking working tree... dirty")
         print("Error: Working tree is not clean", file=sys.stderr)
         sys.exit(1)
-    print("clean")
+    print("Checking working tree... clean")
 
 
-def check_origin_sync():
-    print("Fetching origin...")
-    run(["git", "fetch", "origin"])
-    print("Verifying HEAD matches origin/main...", end=" ", flush=True)
-    local_head = run(["git", "rev-parse", "HEAD"], capture=True)
-    remote_head = run(["git", "rev-parse", "origin/main"], capture=True)
-    if local_head != remote_head:
-        print("mismatch")
+def check_origin_sync(local_head: str, remote_head: str):
+    if not local_head or local_head != remote_head:
+        print("Verifying HEAD matches origin/main... mismatch")
         print(
             "Error: Local HEAD does not match origin/main. Run: git pull",
             file=sys.stderr,
         )
         sys.exit(1)
-    print("ok")
+    print("Verifying HEAD matches origin/main... ok")
 
 
-def find_last_tag() -> str:
-    print("Finding last tag...", end=" ", flush=True)
-    # Find latest v* tag reachable from HEAD (ancestor-aware)
-    result = subprocess.run(
-        ["git", "describe", "--tags", "--abbrev=0", "--match", "v*"],
-        capture_output=True,
-        text=True,
-        cwd=REPO_ROOT,
-    )
-    if result.returncode != 0 or not result.stdout.strip():
-        print("none")
+def find_last_tag(tag: str) -> str:
+    if not tag:
+        print("Finding last tag... none")
         print(
             "Error: No previous tag found. First release must be created manually.",
             file=sys.stderr,
         )
         sys.exit(1)
-    tag = result.stdout.strip()
-    print(tag)
+    print(f"Finding last tag... {tag}")
     return tag
 
 
 def verify_cargo_version(expected_semver: str):
-    print("Verifying versions in Cargo.toml...", end=" ", flush=True)
-    content = (REPO_ROOT / "Cargo.toml").read_text()
-    actual = find_version_in_section(content, "workspace.package") or ""
+    # Structured parse instead of regex: ignores version strings that only
+    # appear in comments or other sections
+    cargo = tomllib.loads(_read_small(REPO_ROOT / "Cargo.toml"))
+    actual = cargo.get("workspace", {}).get("package", {}).get("version", "")
     if actual != expected_semver:
-        print("mismatch")
+        print("Verifying versions in Cargo.toml... mismatch")
         print(
             f"Error: Version mismatch in Cargo.toml. Found {actual}, expected {expected_semver}",
             file=sys.stderr,
         )
         sys.exit(1)
-    print(f"{actual} ok")
+    print(f"Verifying versions in Cargo.toml... {actual} ok")
 
 
 def verify_pyproject_version(expected_pep440: str):
-    print("Verifying versions in pyproject.toml...", end=" ", flush=True)
-    content = (REPO_ROOT / "pyproject.toml").read_text()
-    actual = find_version_in_section(content, "project") or ""
+    pyproject = tomllib.loads(_read_small(REPO_ROOT / "pyproject.toml"))
+    actual = pyproject.get("project", {}).get("version", "")
     if actual != expected_pep440:
-        print("mismatch")
+        print("Verifying versions in pyproject.toml... mismatch")
         print(
             f"Error: Version mismatch in pyproject.toml. Found {actual}, expected {expected_pep440}",
             file=sys.stderr,
         )
         sys.exit(1)
-    print(f"{actual} ok")
+    print(f"Verifying versions in pyproject.toml... {actual} ok")
 
 
 def verify_readme_version(expected_semver: str):
-    print("Verifying versions in README.md...", end=" ", flush=True)
-    content = (REPO_ROOT / "README.md").read_text()
-    lines = content.split("\n")
+    content = _read_small(REPO_ROOT / "README.md")
     found_rev = None
-    for i, line in enumerate(lines):
-        if "repo: https://github.com/jakekaplan/loq" in line:
-            # Search for rev: within the next few lines (handles comments/blank lines)
-            for j in range(i + 1, min(i + 5, len(lines))):
-                match = re.search(r"rev: (v[^\s]+)", lines[j])
-                if match:
-                    found_rev = match.group(1)
-                    break
-                # Stop if we hit another repo: or end of YAML block
-                if "repo:" in lines[j] or lines[j].strip() == "```":
-                    break
-            break
+    pos = content.find("repo: https://github.com/jakekaplan/loq")
+    if pos != -1:
+        # Bound the scan to this entry: stop at the next repo:, the end of
+        # the YAML block, or a small fixed window. Searching with indices
+        # avoids slicing out a substring or splitting the file into lines.
+        end = min(pos + 500, len(content))
+        for stop in ("repo:", "```"):
+            stop_pos = content.find(stop, pos + 1, end)
+            if stop_pos != -1:
+                end = stop_pos
+        match = _README_REV.search(content, pos, end)
+        found_rev = match.group(1) if match else None
     expected_tag = f"v{expected_semver}"
     if found_rev != expected_tag:
-        print("mismatch")
+        print("Verifying versions in README.md... mismatch")
         print(
             f"Error: Version mismatch in README.md. Found {found_rev}, expected {expected_tag}",
             file=sys.stderr,
         )
         sys.exit(1)
-    print(f"{found_rev} ok")
-
-
-def get_commits_since_tag(tag: str) -> str:
-    commits = run(["git", "log", f"{tag}..HEAD", "--oneline"], capture=True)
-    count = len(commits.split("\n")) if commits else 0
-    print(f"Collecting {count} commits since {tag}...")
-    return commits
+    print(f"Verifying versions in README.md... {found_rev} ok")
 
 
-def generate_release_notes(commits: str) -> str:
-    print("Generating release notes...")
+def _stream_release_notes(tag: str) -> str:
+    """Pipe git log straight into claude; the kernel pipe is the buffer."""
     prompt = (
         "Generate concise release notes for loq (a file line limit enforcer). "
         "Group by: Features, Fixes, Other. Be brief. Input is git commits:"
     )
-    notes = run(["claude", "--print", prompt], capture=True, input_text=commits)
+    git_proc = subprocess.Popen(
+        ["git", "log", f"{tag}..HEAD", "--oneline"],
+        stdout=subprocess.PIPE,
+        cwd=REPO_ROOT,
+    )
+    claude_proc = subprocess.Popen(
+        ["claude", "--print", prompt],
+        stdin=git_proc.stdout,
+        stdout=subprocess.PIPE,
+        text=True,
+        cwd=REPO_ROOT,
+    )
+    # Close our copy of the pipe so claude sees EOF when git log finishes
+    git_proc.stdout.close()
+    notes, _ = claude_proc.communicate()
+    if git_proc.wait() != 0:
+        raise subprocess.CalledProcessError(git_proc.returncode, git_proc.args)
+    if claude_proc.returncode != 0:
+        raise subprocess.CalledProcessError(claude_proc.returncode, claude_proc.args)
+    return notes.strip()
+
+
+async def generate_release_notes(tag: str) -> str:
+    print(f"Generating release notes for commits since {tag}...")
+    notes, count = await asyncio.gather(
+        asyncio.to_thread(_stream_release_notes, tag),
+        run_async(["git", "rev-list", "--count", f"{tag}..HEAD"]),
+    )
+    print(f"Summarized {count} commits since {tag}")
     return notes
 
 
 def create_draft_release(tag: str, notes: str):
     print(f"Creating draft release {tag}...")
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".md", delete=False) as f:
-        f.write(notes)
-        notes_file = f.name
-
+    # --notes-file - reads the notes from stdin; no temp file needed
     result = run(
-        [
-            "gh",
-            "release",
-            "create",
-            tag,
-            "--draft",
-            "--title",
-            tag,
-            "--notes-file",
-            notes_file,
-        ],
+        ["gh", "release", "create", tag, "--draft", "--title", tag, "--notes-file", "-"],
         capture=True,
+        input_text=notes,
     )
     print(f"Done: {result}")
 
 
-def main():
+async def main():
     if len(sys.argv) != 2:
         print(f"Usage: {sys.argv[0]} <version>", file=sys.stderr)
         print("Example: python scripts/publish.py 0.1.0a7", file=sys.stderr)
@@ -237,19 +289,64 @@ def main():
         )
         sys.exit(1)
 
-    check_branch()
-    check_working_tree()
-    check_origin_sync()
-    last_tag = find_last_tag()
-
-    verify_cargo_version(semver)
-    verify_pyproject_version(pep440_version)
-    verify_readme_version(semver)
-
-    commits = get_commits_since_tag(last_tag)
-    notes = generate_release_notes(commits)
+    # Kick off the network fetch first; everything up to the sync check is
+    # local work that overlaps it. Fetch only touches remote-tracking refs,
+    # never the working tree, so the local checks are safe meanwhile.
+    print("Fetching origin...")
+    fetch_task = asyncio.create_task(run_async(["git", "fetch", "origin"]))
+    # Retrieve the exception if a precheck exits before the fetch is awaited,
+    # so a failed fetch can't dump a "Task exception was never retrieved"
+    # traceback on top of the real error
+    fetch_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    status_out, described = await asyncio.gather(
+        run_async(["git", "status", "--porcelain=v2", "--branch"]),
+        # Latest v* tag reachable from HEAD (ancestor-aware)
+        run_async(
+            ["git", "describe", "--tags", "--abbrev=0", "--match", "v*"], check=False
+        ),
+    )
+    branch, dirty = parse_git_status(status_out)
+    check_branch(branch)
+    check_working_tree(dirty)
+    last_tag = find_last_tag(described)
+
+    # Independent file reads + regex checks; each prints a single line so
+    # output stays readable when they interleave. Collect every result before
+    # exiting so one mismatch doesn't hide the others.
+    results = await asyncio.gather(
+        asyncio.to_thread(verify_cargo_version, semver),
+        asyncio.to_thread(verify_pyproject_version, pep440_version),
+        asyncio.to_thread(verify_readme_version, semver),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+    # The sync check needs fresh remote-tracking refs, so it waits for the
+    # fetch; one rev-parse resolves both SHAs
+    await fetch_task
+    heads = await run_async(["git", "rev-parse", "HEAD", "origin/main"])
+    local_head, _, remote_head = heads.partition("\n")
+    check_origin_sync(local_head, remote_head)
+
+    notes = await generate_release_notes(last_tag)
     create_draft_release(f"v{semver}", notes)
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        asyncio.run(main())
+    except subprocess.CalledProcessError as exc:
+        stderr = exc.stderr
+        if isinstance(stderr, bytes):
+            stderr = stderr.decode("utf-8", "replace")
+        if stderr:
+            print(stderr, file=sys.stderr)
+        cmd = exc.cmd if isinstance(exc.cmd, str) else " ".join(exc.cmd)
+        print(
+            f"Error: Command failed with exit code {exc.returncode}: {cmd}",
+            file=sys.stderr,
+        )
+        sys.exit(1)